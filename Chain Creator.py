@@ -5,6 +5,7 @@ import pickle
 import os
 import requests
 from datetime import datetime  # For timestamp
+import Validator
 
 # Global variables
 chains = []
@@ -14,6 +15,8 @@ current_chain = []  # List to store the current chain's steps
 chain_name = ""  # To store the name of the current chain
 PICKLE_FILE = "chains.pkl"  # File to store chains
 step_history = []  # List to store the history of the steps added
+card_index = {}  # Card name -> ID map from ID.csv, used to validate steps
+card_matcher = None  # Validator.CardMatcher over card_index, reused for every check
 
 # Function to save all chains using pickle
 def save_all_chains():
@@ -51,6 +54,26 @@ def fetch_available_cards():
     except requests.exceptions.RequestException as e:
         messagebox.showerror("Error", f"Failed to fetch card data: {e}")
 
+# Load the card ID index used to validate steps
+def load_card_index():
+    global card_index, card_matcher
+    try:
+        card_index = Validator.load_card_index()
+        card_matcher = Validator.CardMatcher(card_index)
+        print(f"Loaded {len(card_index)} card IDs for validation.")
+    except Exception as e:
+        messagebox.showerror("Error", f"Failed to load card ID data: {e}")
+
+# Function to check a step before it is added, returns True if it should be kept
+def confirm_step(step):
+    if not card_index:
+        return True
+    issues = Validator.validate_step(step, card_index, matcher=card_matcher)
+    if not issues:
+        return True
+    report = "\n".join(Validator.format_issue(issue) for issue in issues)
+    return messagebox.askyesno("Check Step", f"{report}\n\nKeep this step anyway?")
+
 # Function to start a new chain
 def start_chain():
     global chain_name, chain_name_entry, step_history
@@ -82,6 +105,8 @@ def create_step():
         "effects": [effect],
         "next_cards": [next_card_1, next_card_2, next_card_3]
     }
+    if not confirm_step(step):
+        return
     current_chain.append(step)
     
     # Add the step to the history with timestamp
@@ -219,6 +244,30 @@ def show_main_menu():
     ttk.Button(root, text="Edit Chain", command=edit_chain).grid(row=2, column=0, padx=10, pady=10)
     ttk.Button(root, text="Start New Chain", command=start_chain).grid(row=2, column=1, padx=10, pady=10)
     ttk.Button(root, text="Delete Chain", command=delete_chain).grid(row=3, column=0, padx=10, pady=10)
+    ttk.Button(root, text="Validate Chains", command=show_validation_report).grid(row=3, column=1, padx=10, pady=10)
+
+# Function to check all saved chains against the card catalog and show the results
+def show_validation_report():
+    if not card_index:
+        messagebox.showerror("Error", "Card ID data is not loaded, cannot validate chains!")
+        return
+
+    issues = Validator.validate_chains(chains, card_index, matcher=card_matcher)
+
+    # Clear all widgets
+    for widget in root.winfo_children():
+        widget.grid_forget()
+
+    ttk.Label(root, text="Chain Validation").grid(row=0, column=0, padx=10, pady=5)
+    report_text = tk.Text(root, width=100, height=25, wrap="word")
+    scrollbar = ttk.Scrollbar(root, orient="vertical", command=report_text.yview)
+    report_text.configure(yscrollcommand=scrollbar.set)
+    report_text.insert("1.0", Validator.format_report(issues))
+    report_text.configure(state="disabled")
+    report_text.grid(row=1, column=0, padx=10, pady=5)
+    scrollbar.grid(row=1, column=1, sticky="ns")
+
+    ttk.Button(root, text="Back to Main Menu", command=show_main_menu).grid(row=2, column=0, padx=10, pady=10)
 
 # Function to edit an existing chain
 def edit_chain():
@@ -260,6 +309,14 @@ def show_chain_steps():
 # Function to edit a specific step
 def edit_step(index):
     step = current_chain[index]
+    next_cards = list(step['next_cards'])
+    if len(next_cards) > 3:
+        # The form only has three next card slots, updating the step would drop the rest
+        dropped = ", ".join(card for card in next_cards[3:] if card) or "empty slots"
+        if not messagebox.askyesno("Edit Step", f"This step has {len(next_cards)} next cards but only 3 can be edited.\n"
+                                   f"Updating it will remove: {dropped}\n\nEdit anyway?"):
+            return
+    next_cards = (next_cards + ['', '', ''])[:3]  # Older steps may have fewer than three
     
     # Recreate the dropdowns for editing the step
     opening_card_dropdown = create_searchable_combobox(root, available_cards)
@@ -271,15 +328,15 @@ def edit_step(index):
     effect_dropdown.grid(row=3, column=1, padx=10, pady=5)
 
     next_card_dropdown_1 = create_searchable_combobox(root, available_cards)
-    next_card_dropdown_1.set(step['next_cards'][0])  # Set the current next card 1
+    next_card_dropdown_1.set(next_cards[0])  # Set the current next card 1
     next_card_dropdown_1.grid(row=4, column=0, padx=10, pady=5)
 
     next_card_dropdown_2 = create_searchable_combobox(root, available_cards)
-    next_card_dropdown_2.set(step['next_cards'][1])  # Set the current next card 2
+    next_card_dropdown_2.set(next_cards[1])  # Set the current next card 2
     next_card_dropdown_2.grid(row=4, column=1, padx=10, pady=5)
 
     next_card_dropdown_3 = create_searchable_combobox(root, available_cards)
-    next_card_dropdown_3.set(step['next_cards'][2])  # Set the current next card 3
+    next_card_dropdown_3.set(next_cards[2])  # Set the current next card 3
     next_card_dropdown_3.grid(row=4, column=2, padx=10, pady=5)
 
     # Change the "Add Step" button to "Update Step"
@@ -298,11 +355,14 @@ def update_step(index, opening_card_dropdown, effect_dropdown, next_card_dropdow
         return
 
     # Update the step
-    current_chain[index] = {
+    step = {
         "opening_card": opening_card,
         "effects": [effect],
         "next_cards": [next_card_1, next_card_2, next_card_3]
     }
+    if not confirm_step(step):
+        return
+    current_chain[index] = step
 
     messagebox.showinfo("Step Updated", "Step updated successfully!")
     show_chain_steps()
@@ -331,6 +391,7 @@ root.title("Yu-Gi-Oh Chain Manager")
 # Load the chains and available cards initially
 load_all_chains()
 fetch_available_cards()
+load_card_index()
 
 # Show the main menu initially
 show_main_menu()
@@ -0,0 +1,423 @@
+import asyncio
+import hashlib
+import io
+import json
+import os
+import pickle
+import sys
+import time
+from collections import OrderedDict
+from datetime import datetime
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+import requests
+from PIL import Image
+
+import Validator
+
+# File paths
+PICKLE_FILE = "chains.pkl"
+IMAGES_FOLDER = "Local Images"
+ACTION_LOG_FILE = "action_log.txt"
+CARD_IMAGE_URL_TEMPLATE = "https://images.ygoprodeck.com/images/cards/{}.jpg"
+
+# Server settings
+HOST = "127.0.0.1"
+PORT = 8765
+THUMB_SIZE = (150, 200)  # Same size the Viewer draws cards at
+SEARCH_LIMIT = 20
+MAX_HEADER_BYTES = 16384
+MAX_BODY_BYTES = 16384  # GET/HEAD requests have no use for a body, larger ones are refused
+KEEP_ALIVE_TIMEOUT = 15  # Seconds an idle connection is kept open
+THUMB_CACHE_BYTES = 32 * 1024 * 1024  # Thumbnails kept in memory, full images are read from disk
+DOWNLOAD_RETRY_SECONDS = 300  # How long a failed image download is remembered before trying again
+
+# Global variables
+chains = []
+chains_mtime = None
+card_id_map = {}
+card_ids = set()  # Every ID in the catalog, only these images are downloaded
+card_names = []  # Sorted card names, used for search
+card_names_lower = []  # Lower-cased copy of card_names, same order
+response_cache = {}  # Encoded JSON responses, cleared when chains.pkl changes
+search_cache = {}
+thumb_cache = OrderedDict()  # card_id -> (mtime, body, etag), least recently used first
+thumb_cache_bytes = 0
+download_locks = {}
+download_failures = {}  # card_id -> (time of failure, error message)
+
+STATUS_TEXT = {
+    200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 413: "Content Too Large", 431: "Request Header Fields Too Large",
+    500: "Internal Server Error", 502: "Bad Gateway",
+}
+
+
+class HTTPError(Exception):
+    """Error that is sent back to the client as a JSON error response."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def log_action(action):
+    """Log actions to a file."""
+    with open(ACTION_LOG_FILE, "a") as log_file:
+        log_file.write(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - {action}\n")
+
+def load_card_id_map():
+    """Load card ID mappings from the local ID.csv, falling back to the repository URL."""
+    global card_id_map, card_ids, card_names, card_names_lower
+    try:
+        print("Loading card ID map...")
+        card_id_map = Validator.load_card_index()
+        card_ids = set(card_id_map.values())
+        card_names = sorted(card_id_map, key=str.lower)
+        card_names_lower = [name.lower() for name in card_names]
+        search_cache.clear()
+        print(f"Loaded {len(card_id_map)} card IDs")
+    except Exception as e:
+        print(f"Failed to load card ID data: {e}")
+
+def load_chains():
+    """Reload chains from the pickle file if it changed since the last load."""
+    global chains, chains_mtime
+    try:
+        mtime = os.stat(PICKLE_FILE).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    if mtime == chains_mtime:
+        return
+    loaded = []
+    if mtime is not None:
+        try:
+            with open(PICKLE_FILE, 'rb') as file:
+                loaded = pickle.load(file)
+            if not isinstance(loaded, list):
+                raise ValueError("Loaded chains data is not a list")
+            print(f"Chains loaded: {len(loaded)}")
+        except Exception as e:
+            # Keep serving the previous chains, the Creator may be mid-write
+            print(f"Failed to load chains: {e}")
+            return
+    chains = loaded
+    chains_mtime = mtime
+    response_cache.clear()
+
+def find_chain(name):
+    """Return the chain with the given name or raise a 404."""
+    chain = next((chain for chain in chains if chain.get("chain_name") == name), None)
+    if chain is None:
+        raise HTTPError(404, f"Chain '{name}' not found")
+    return chain
+
+def card_info(card_name):
+    """Describe a card by name, including its ID and image URLs when known."""
+    card_id = card_id_map.get(card_name)
+    info = {"name": card_name, "id": card_id}
+    if card_id:
+        info["image"] = f"/images/{card_id}.jpg"
+        info["thumb"] = f"/images/{card_id}.jpg?size=thumb"
+    return info
+
+def chain_url(name):
+    """Build the URL path for a chain."""
+    return "/chains/" + quote(name, safe="")
+
+def list_chains():
+    """Summary of every saved chain."""
+    return {
+        "chains": [
+            {"chain_name": chain.get("chain_name"), "steps": len(chain.get("steps", [])),
+             "url": chain_url(chain.get("chain_name", ""))}
+            for chain in chains
+        ]
+    }
+
+def get_chain(name):
+    """Full chain with card details for every step."""
+    chain = find_chain(name)
+    steps = chain.get("steps", [])
+    return {
+        "chain_name": name,
+        "steps": [step_payload(name, steps, number) for number in range(1, len(steps) + 1)],
+    }
+
+def get_step(name, number):
+    """A single step of a chain, with links to the neighbouring steps for playback."""
+    steps = find_chain(name).get("steps", [])
+    if not 1 <= number <= len(steps):
+        raise HTTPError(404, f"Chain '{name}' has no step {number}")
+    return step_payload(name, steps, number)
+
+def step_payload(name, steps, number):
+    """Build the JSON payload for step `number` (1-based) of a chain."""
+    step = steps[number - 1]
+    base = chain_url(name) + "/steps/"
+    return {
+        "chain_name": name,
+        "step": number,
+        "total": len(steps),
+        "opening_card": card_info(step.get("opening_card", "")),
+        "effects": list(step.get("effects", [])),
+        "next_cards": [card_info(card) for card in step.get("next_cards", []) if card],
+        "prev": f"{base}{number - 1}" if number > 1 else None,
+        "next": f"{base}{number + 1}" if number < len(steps) else None,
+    }
+
+def search_cards(query, limit):
+    """Case-insensitive card name search, names starting with the query first."""
+    key = (query, limit)
+    if key in search_cache:
+        return search_cache[key]
+    prefix, contains = [], []
+    for name, lowered in zip(card_names, card_names_lower):
+        if lowered.startswith(query):
+            prefix.append(name)
+            if len(prefix) >= limit:
+                break
+        elif query in lowered and len(contains) < limit:
+            contains.append(name)
+    results = {"query": query, "cards": [card_info(name) for name in (prefix + contains)[:limit]]}
+    if len(search_cache) > 4096:
+        search_cache.clear()
+    search_cache[key] = results
+    return results
+
+def download_card_image(card_id):
+    """Download and save the card image locally if not already downloaded."""
+    image_path = os.path.join(IMAGES_FOLDER, f"{card_id}.jpg")
+    if not os.path.exists(image_path):
+        image_url = CARD_IMAGE_URL_TEMPLATE.format(card_id)
+        print(f"Downloading image {card_id} from {image_url}")
+        response = requests.get(image_url, timeout=10)
+        response.raise_for_status()
+        tmp_path = image_path + ".part"
+        with open(tmp_path, 'wb') as f:
+            f.write(response.content)
+        os.replace(tmp_path, image_path)
+    return image_path
+
+def read_image(image_path, size):
+    """Read an image from disk, resizing it to a thumbnail when asked."""
+    if size == "thumb":
+        with Image.open(image_path) as img:
+            img = img.convert("RGB").resize(THUMB_SIZE)
+            buffer = io.BytesIO()
+            img.save(buffer, format="JPEG", quality=85)
+            return buffer.getvalue()
+    with open(image_path, 'rb') as f:
+        return f.read()
+
+async def fetch_image(card_id, image_path):
+    """Download a card image once, even with many clients asking for it at the same time."""
+    failure = download_failures.get(card_id)
+    if failure and time.monotonic() - failure[0] < DOWNLOAD_RETRY_SECONDS:
+        raise HTTPError(502, failure[1])
+    lock = download_locks.setdefault(card_id, asyncio.Lock())
+    try:
+        async with lock:
+            if os.path.exists(image_path):
+                return
+            failure = download_failures.get(card_id)
+            if failure and time.monotonic() - failure[0] < DOWNLOAD_RETRY_SECONDS:
+                raise HTTPError(502, failure[1])
+            try:
+                await asyncio.to_thread(download_card_image, card_id)
+                download_failures.pop(card_id, None)
+                log_action(f"Downloaded image {card_id}")
+            except (requests.exceptions.RequestException, OSError) as e:
+                message = f"Failed to download image {card_id}: {e}"
+                download_failures[card_id] = (time.monotonic(), message)
+                raise HTTPError(502, message)
+    finally:
+        download_locks.pop(card_id, None)
+
+def cache_thumb(card_id, entry):
+    """Store a thumbnail, evicting the least recently used ones over THUMB_CACHE_BYTES."""
+    global thumb_cache_bytes
+    old = thumb_cache.pop(card_id, None)
+    if old:
+        thumb_cache_bytes -= len(old[1])
+    thumb_cache[card_id] = entry
+    thumb_cache_bytes += len(entry[1])
+    while thumb_cache_bytes > THUMB_CACHE_BYTES and thumb_cache:
+        _, evicted = thumb_cache.popitem(last=False)
+        thumb_cache_bytes -= len(evicted[1])
+
+async def get_image(card_id, size):
+    """Return (body, etag) for a card image, downloading it into the local cache if needed."""
+    if card_id not in card_ids:
+        raise HTTPError(404, f"Unknown card ID '{card_id}'")
+    if size not in ("full", "thumb"):
+        raise HTTPError(400, f"Unknown image size '{size}'")
+    image_path = os.path.join(IMAGES_FOLDER, f"{card_id}.jpg")
+    if not os.path.exists(image_path):
+        await fetch_image(card_id, image_path)
+    mtime = os.stat(image_path).st_mtime_ns
+    etag = f'"{card_id}-{size}-{mtime:x}"'
+    if size == "full":
+        return await asyncio.to_thread(read_image, image_path, size), etag
+    cached = thumb_cache.get(card_id)
+    if cached and cached[0] == mtime:
+        thumb_cache.move_to_end(card_id)
+        return cached[1], cached[2]
+    body = await asyncio.to_thread(read_image, image_path, size)
+    cache_thumb(card_id, (mtime, body, etag))
+    return body, etag
+
+def json_response(payload):
+    """Encode a JSON payload and its ETag."""
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    return body, '"' + hashlib.md5(body).hexdigest() + '"'
+
+async def route(path, query):
+    """Dispatch a GET request, returning (body, etag, content_type)."""
+    parts = [unquote(part) for part in path.strip("/").split("/")] if path.strip("/") else []
+
+    if parts and parts[0] == "images" and len(parts) == 2 and parts[1].endswith(".jpg"):
+        size = query.get("size", ["full"])[0]
+        body, etag = await get_image(parts[1][:-len(".jpg")], size)
+        return body, etag, "image/jpeg"
+
+    if parts == ["cards"]:
+        text = query.get("q", [""])[0].strip().lower()
+        if not text:
+            raise HTTPError(400, "Missing search query 'q'")
+        try:
+            limit = max(1, min(int(query.get("limit", [SEARCH_LIMIT])[0]), 200))
+        except ValueError:
+            raise HTTPError(400, "Search limit must be a number")
+        return *json_response(search_cards(text, limit)), "application/json"
+
+    if parts and parts[0] == "chains":
+        load_chains()
+        cache_key = tuple(parts)  # Parts are unquoted, so joining them again would be ambiguous
+        if cache_key in response_cache:
+            return *response_cache[cache_key], "application/json"
+        if len(parts) == 1:
+            payload = list_chains()
+        elif len(parts) == 2:
+            payload = get_chain(parts[1])
+        elif len(parts) == 4 and parts[2] == "steps":
+            try:
+                number = int(parts[3])
+            except ValueError:
+                raise HTTPError(404, f"Invalid step number '{parts[3]}'")
+            payload = get_step(parts[1], number)
+        else:
+            raise HTTPError(404, f"Unknown path '{path}'")
+        response_cache[cache_key] = json_response(payload)
+        return *response_cache[cache_key], "application/json"
+
+    raise HTTPError(404, f"Unknown path '{path}'")
+
+def build_response(status, body, content_type, etag=None, keep_alive=True, head=False):
+    """Serialize an HTTP/1.1 response."""
+    headers = [
+        f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}",
+        f"Content-Length: {len(body)}",
+        "Connection: keep-alive" if keep_alive else "Connection: close",
+        "Access-Control-Allow-Origin: *",
+    ]
+    if content_type:
+        headers.append(f"Content-Type: {content_type}")
+    if etag:
+        headers.append(f"ETag: {etag}")
+        headers.append("Cache-Control: no-cache")
+    head_bytes = ("\r\n".join(headers) + "\r\n\r\n").encode("latin-1")
+    return head_bytes if head or status == 304 else head_bytes + body
+
+async def handle_request(request_line, headers):
+    """Turn one parsed request into (status, body, content_type, etag)."""
+    try:
+        method, target, _ = request_line.split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "Malformed request line")
+    if method not in ("GET", "HEAD"):
+        raise HTTPError(405, f"Method {method} not allowed")
+    url = urlsplit(target)
+    body, etag, content_type = await route(url.path, parse_qs(url.query))
+    if_none_match = headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]):
+        return 304, b"", None, etag
+    return 200, body, content_type, etag
+
+async def handle_connection(reader, writer):
+    """Serve requests on one connection until the client closes it or it goes idle."""
+    try:
+        while True:
+            try:
+                raw = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEP_ALIVE_TIMEOUT)
+            except asyncio.LimitOverrunError:
+                writer.write(build_response(431, b"", None, keep_alive=False))
+                break
+            except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                break
+
+            lines = raw.decode("latin-1").split("\r\n")
+            request_line = lines[0]
+            headers = {}
+            for line in lines[1:]:
+                if ":" in line:
+                    key, value = line.split(":", 1)
+                    headers[key.strip().lower()] = value.strip()
+
+            # GET requests should not carry a body, but drain a small one if sent
+            length = headers.get("content-length", "0")
+            if not length.isdigit():
+                writer.write(build_response(400, b"", None, keep_alive=False))
+                break
+            if int(length) > MAX_BODY_BYTES:
+                writer.write(build_response(413, b"", None, keep_alive=False))
+                break
+            if int(length):
+                try:
+                    await asyncio.wait_for(reader.readexactly(int(length)), KEEP_ALIVE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+
+            connection = headers.get("connection", "").lower()
+            keep_alive = connection != "close" and (request_line.endswith("HTTP/1.1") or connection == "keep-alive")
+            head = request_line.startswith("HEAD ")
+            try:
+                status, body, content_type, etag = await handle_request(request_line, headers)
+            except HTTPError as e:
+                status, content_type, etag = e.status, "application/json", None
+                body = json.dumps({"error": e.message}).encode("utf-8")
+            except Exception as e:
+                print(f"Error handling '{request_line}': {e}")
+                status, content_type, etag = 500, "application/json", None
+                body = json.dumps({"error": "Internal server error"}).encode("utf-8")
+
+            writer.write(build_response(status, body, content_type, etag, keep_alive, head))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+async def main(host=HOST, port=PORT):
+    """Load the chain store and card catalog, then serve until interrupted."""
+    if not os.path.exists(IMAGES_FOLDER):
+        os.makedirs(IMAGES_FOLDER)
+    load_card_id_map()
+    load_chains()
+    server = await asyncio.start_server(handle_connection, host, port, limit=MAX_HEADER_BYTES, backlog=512)
+    print(f"Serving chains on http://{host}:{port}")
+    log_action(f"Server started on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+if __name__ == "__main__":
+    # Usage: python Server.py [port] [host]
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else PORT
+    host = sys.argv[2] if len(sys.argv) > 2 else HOST
+    try:
+        asyncio.run(main(host, port))
+    except KeyboardInterrupt:
+        print("Server stopped.")
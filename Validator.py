@@ -0,0 +1,258 @@
+import argparse
+import difflib
+import heapq
+import json
+import os
+import pickle
+import re
+import sys
+
+import pandas as pd
+
+# File paths
+PICKLE_FILE = "chains.pkl"
+ID_FILE = "ID.csv"
+ID_URL = "https://raw.githubusercontent.com/LJEN94/MasterDuelDB/main/ID.csv"
+
+NEXT_CARD_SLOTS = 3  # The Creator's step form and edit_step use exactly three next cards
+MAX_SUGGESTIONS = 3
+SUGGESTION_CUTOFF = 0.8
+SUGGESTION_CANDIDATES = 50  # Names sharing the most trigrams that get a full similarity check
+
+
+def load_card_index(source=None):
+    """Load the card name -> ID index from the local ID.csv, falling back to the repository URL."""
+    if source is None:
+        source = ID_FILE if os.path.exists(ID_FILE) else ID_URL
+    df = pd.read_csv(source, encoding="utf-8-sig", dtype=str, keep_default_na=False)
+    df.columns = df.columns.str.strip()  # Clean header names
+    return {name.strip(): card_id.strip() for name, card_id in zip(df['Name'], df['ID'])}
+
+def normalize_name(name):
+    """Fold case, quotes, punctuation and spacing so near-identical names compare equal."""
+    return re.sub(r"[^0-9a-z]+", " ", name.casefold()).strip()
+
+def trigrams(key):
+    """Character trigrams of a normalized name, padded so short names still have some."""
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class CardMatcher:
+    """Resolves card names against the index, caching the result for each distinct name."""
+
+    def __init__(self, card_index):
+        self.card_index = card_index
+        self.normalized = {}
+        for name in card_index:
+            self.normalized.setdefault(normalize_name(name), name)
+        self.normalized_keys = list(self.normalized)
+        self.trigram_index = None  # Built on the first unknown name
+        self.cache = {}
+
+    def suggest(self, key):
+        """Catalog names closest to a normalized name that is not in the catalog."""
+        if self.trigram_index is None:
+            # Trigram -> indexes into normalized_keys, so suggestions only compare against likely names
+            self.trigram_index = {}
+            for position, name_key in enumerate(self.normalized_keys):
+                for trigram in trigrams(name_key):
+                    self.trigram_index.setdefault(trigram, []).append(position)
+        shared = {}
+        for trigram in trigrams(key):
+            for position in self.trigram_index.get(trigram, ()):
+                shared[position] = shared.get(position, 0) + 1
+        candidates = heapq.nlargest(SUGGESTION_CANDIDATES, shared, key=shared.get)
+        matches = difflib.get_close_matches(
+            key, [self.normalized_keys[position] for position in candidates], MAX_SUGGESTIONS, SUGGESTION_CUTOFF)
+        return [self.normalized[match] for match in matches]
+
+    def check(self, name):
+        """Return None for a known card, otherwise (code, suggestions)."""
+        if name in self.card_index:
+            return None
+        if name in self.cache:
+            return self.cache[name]
+        key = normalize_name(name)
+        if key in self.normalized:
+            # Same card, only case/punctuation/spacing differs
+            result = ("near-miss", [self.normalized[key]])
+        else:
+            result = ("unknown-card", self.suggest(key))
+        self.cache[name] = result
+        return result
+
+def make_issue(severity, code, message, chain=None, step=None, card=None, suggestions=None):
+    """Build an issue record. `step` is 1-based, like the step numbers shown in the GUI."""
+    return {
+        "severity": severity,
+        "code": code,
+        "chain": chain,
+        "step": step,
+        "card": card,
+        "message": message,
+        "suggestions": suggestions or [],
+    }
+
+def check_step_shape(step, chain_name=None, number=None):
+    """Check that a step has the structure the Creator and Viewer expect."""
+    issues = []
+    if not isinstance(step, dict):
+        return [make_issue("error", "bad-step", "Step is not a dictionary", chain_name, number)]
+
+    opening_card = step.get("opening_card")
+    if not isinstance(opening_card, str) or not opening_card.strip():
+        issues.append(make_issue("error", "missing-opening-card", "Step has no opening card", chain_name, number))
+
+    effects = step.get("effects")
+    if not isinstance(effects, list) or not effects or not all(isinstance(effect, str) and effect for effect in effects):
+        issues.append(make_issue("error", "missing-effect", "Step has no effect", chain_name, number))
+
+    next_cards = step.get("next_cards")
+    if not isinstance(next_cards, list) or not all(isinstance(card, str) for card in next_cards):
+        issues.append(make_issue("error", "bad-next-cards", "Next cards are not a list of names", chain_name, number))
+    else:
+        if len(next_cards) != NEXT_CARD_SLOTS:
+            issues.append(make_issue(
+                "error", "next-cards-count",
+                f"Step has {len(next_cards)} next card slots, expected {NEXT_CARD_SLOTS}", chain_name, number))
+        if not any(card.strip() for card in next_cards):
+            issues.append(make_issue("error", "no-next-cards", "Step has no next cards", chain_name, number))
+    return issues
+
+def step_card_names(step):
+    """Yield every non-empty card name referenced by a well-formed part of a step."""
+    if not isinstance(step, dict):
+        return
+    opening_card = step.get("opening_card")
+    if isinstance(opening_card, str) and opening_card.strip():
+        yield opening_card
+    next_cards = step.get("next_cards")
+    if isinstance(next_cards, list):
+        for card in next_cards:
+            if isinstance(card, str) and card.strip():
+                yield card
+
+def card_issue(result, name, chain_name=None, number=None):
+    """Turn a CardMatcher result into an issue record."""
+    code, suggestions = result
+    if code == "near-miss":
+        message = f"Card name '{name}' does not match the catalog exactly, did you mean '{suggestions[0]}'?"
+        return make_issue("warning", code, message, chain_name, number, name, suggestions)
+    message = f"Card name '{name}' not found in card ID map"
+    if suggestions:
+        message += ", did you mean " + " or ".join(f"'{suggestion}'" for suggestion in suggestions) + "?"
+    return make_issue("error", code, message, chain_name, number, name, suggestions)
+
+def validate_step(step, card_index, matcher=None):
+    """Validate a single step, e.g. before the Creator adds or updates it."""
+    matcher = matcher or CardMatcher(card_index)
+    issues = check_step_shape(step)
+    for name in step_card_names(step):
+        result = matcher.check(name)
+        if result:
+            issues.append(card_issue(result, name))
+    return issues
+
+def validate_chains(chains, card_index, matcher=None):
+    """Validate every step of every chain in one pass.
+
+    Structure and reachability are checked while walking the chains, card
+    references are collected and each distinct name is looked up once.
+    """
+    issues = []
+    references = {}  # card name -> [(chain name, step number), ...]
+    seen_names = set()
+
+    for chain in chains:
+        if not isinstance(chain, dict) or not isinstance(chain.get("chain_name"), str):
+            issues.append(make_issue("error", "bad-chain", "Chain has no name"))
+            continue
+        chain_name = chain["chain_name"]
+        if chain_name in seen_names:
+            issues.append(make_issue("warning", "duplicate-chain", f"Chain name '{chain_name}' is used more than once", chain_name))
+        seen_names.add(chain_name)
+
+        steps = chain.get("steps")
+        if not isinstance(steps, list):
+            issues.append(make_issue("error", "bad-chain", "Chain steps are not a list", chain_name))
+            continue
+        if not steps:
+            issues.append(make_issue("warning", "empty-chain", "Chain has no steps", chain_name))
+
+        # A later step is reachable if its opening card was already on the field
+        reached = set()
+        for number, step in enumerate(steps, start=1):
+            issues.extend(check_step_shape(step, chain_name, number))
+            names = list(step_card_names(step))
+            for name in names:
+                references.setdefault(name, []).append((chain_name, number))
+
+            opening_card = step.get("opening_card") if isinstance(step, dict) else None
+            if number > 1 and names and names[0] == opening_card and normalize_name(opening_card) not in reached:
+                issues.append(make_issue(
+                    "warning", "unreachable-step",
+                    f"Opening card '{opening_card}' is not brought out by any earlier step",
+                    chain_name, number, opening_card))
+            reached.update(normalize_name(name) for name in names)
+
+    matcher = matcher or CardMatcher(card_index)
+    for name, locations in references.items():
+        result = matcher.check(name)
+        if result:
+            for chain_name, number in locations:
+                issues.append(card_issue(result, name, chain_name, number))
+
+    issues.sort(key=lambda issue: (issue["chain"] or "", issue["step"] or 0))
+    return issues
+
+def format_issue(issue):
+    """Single-line, human readable description of an issue."""
+    location = []
+    if issue["chain"] is not None:
+        location.append(issue["chain"])
+    if issue["step"] is not None:
+        location.append(f"Step {issue['step']}")
+    prefix = f"[{' / '.join(location)}] " if location else ""
+    return f"{issue['severity'].upper()}: {prefix}{issue['message']}"
+
+def format_report(issues):
+    """Human readable report for the GUI and the command line."""
+    if not issues:
+        return "No problems found."
+    errors = sum(1 for issue in issues if issue["severity"] == "error")
+    lines = [format_issue(issue) for issue in issues]
+    lines.append(f"\n{errors} error(s), {len(issues) - errors} warning(s)")
+    return "\n".join(lines)
+
+def load_chains(path=PICKLE_FILE):
+    """Load chains from the pickle file."""
+    with open(path, 'rb') as file:
+        chains = pickle.load(file)
+    if not isinstance(chains, list):
+        raise ValueError("Loaded chains data is not a list")
+    return chains
+
+def main(argv=None):
+    """Validate a chains file from the command line. Exits with 1 if any errors are found."""
+    parser = argparse.ArgumentParser(description="Validate saved chains against the card catalog.")
+    parser.add_argument("chains", nargs="?", default=PICKLE_FILE, help="chains pickle file (default: chains.pkl)")
+    parser.add_argument("--ids", default=None, help="card ID CSV (default: local ID.csv, else the repository copy)")
+    parser.add_argument("--json", action="store_true", help="print issues as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        chains = load_chains(args.chains)
+        card_index = load_card_index(args.ids)
+    except Exception as e:
+        print(f"Failed to load data: {e}", file=sys.stderr)
+        return 2
+
+    issues = validate_chains(chains, card_index)
+    if args.json:
+        print(json.dumps(issues, indent=2, ensure_ascii=False))
+    else:
+        print(format_report(issues))
+    return 1 if any(issue["severity"] == "error" for issue in issues) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())